@@ -1,290 +1,579 @@
-import os
-import uuid
-import logging
-from datetime import datetime
-from langchain_community.graphs import Neo4jGraph
-from langchain.chains import GraphCypherQAChain
-from langchain.prompts import PromptTemplate
-from langchain.chat_models import AzureChatOpenAI
-from langchain.tools import Tool
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_community.chat_message_histories import Neo4jChatMessageHistory
-
-# Set up logging (optional)
-logging.basicConfig(filename='chatbot_errors.log', level=logging.ERROR)
-
-# Utility function to generate unique session IDs
-def get_session_id():
-    """
-    Generate a unique session ID for tracking chat sessions.
-    This can be used to uniquely identify each session.
-    """
-    return str(uuid.uuid4())  # Generate a unique session ID
-
-def get_memory(session_id):
-    return Neo4jChatMessageHistory(session_id=session_id, graph=graph)
-
-# Function to log errors
-def log_error(error_message):
-    logging.error(error_message)
-
-# Fetch API credentials
-openai_api_key = os.getenv("open_api_key")
-openai_api_version = os.getenv("openai_api_version")
-
-# Initialize the Neo4j graph connection
-graph = Neo4jGraph(
-    url="bolt://localhost:7687",
-    username="neo4j",
-    password="########",  # Ensure this is correct for your setup
-    database="neo4j",
-)
-
-# Initialize the AzureChatOpenAI model
-llm = AzureChatOpenAI(
-    temperature=0.01, 
-    streaming=True, 
-    deployment_name="gpt-4o", 
-    openai_api_version=openai_api_version, 
-    openai_api_key=openai_api_key, 
-    openai_api_base=openai_api_base
-)
-
-# Prompt template for Cypher query generation
-CYPHER_GENERATION_TEMPLATE = """
-You are an expert Neo4j Developer translating user questions into Cypher to answer questions about products and provide recommendations.
-Convert the user's question based on the schema provided.
-
-Instructions:
-- Use only the provided Nodes and Relationships in the schema.
-- Use only the provided relationship types and properties in the schema.
-- Cypher Query should start with "USE neo4j" every time.
-- toLower function should be used for all attributes in the schema.
-- and convert every attribute to string before using it in the query.
-- always use `WHERE` clauses with `CONTAINS` for partial string matching (Don't use attributes names after `CONTAINS`)
-- check the user input has a word in the schema such as Nodes,Relationships and Properties.
-
-Schema:
-Nodes:
-- CompanyNode Labels and Properties:
-  ['Customer']: ['CustomerCode', 'CustomerName']
-  ['Supplier']: ['BuyerCode', 'Supplier','SupplierName']
-  ['Product']: ['ItemCost', 'ItemType', 'PartDescription', 'PartNo', 'PriceWithoutTax']
- 
-Relationship Types and Properties:
-- (Customer)-[:PLACES]->(SalesOrder)
-- (SalesOrder)-[:INCLUDES_PRODUCT{{ OrderQty, ShippedQty, BOQty}}]->(Product)
-- (SalesOrder)-[:DISPATCHED_BY]->(Warehouse)
-- (Warehouse)-[:DELIVERS_TO]->(Customer)
-- (Company)-[:OWNS]->(Warehouse)
-- (Company)-[:ISSUES]->(PurchaseOrder)
-
-Question: {question}
-
-"""
-
-# Create tools for the agent with error handling
-def cypher_qa(query):
-    try:
-        result = cypher_chain.invoke({"query": query})
-        return result
-    except Exception as e:
-        log_error(f"Cypher error occurred: {str(e)}")
-        print(e)
-        return "There was an issue processing your request. Please try again or contact support."
-
-def order_tracking(query):
-    try:
-        result = cypher_chain.invoke({"query": query})
-        return result
-    except Exception as e:
-        log_error(f"Cypher error occurred: {str(e)}")
-        print(e)
-        return "Unable to track the order at the moment. Please try again later or contact support."
-
-def supplier_info(query):
-    try:
-        result = cypher_chain.invoke({"query": query})
-        return result
-    except Exception as e:
-        log_error(f"Cypher error occurred: {str(e)}")
-        print(e)
-        return "Unable to fetch supplier information. Please try again later or contact support."
-
-def warehouse_inventory(query):
-    try:
-        result = cypher_chain.invoke({"query": query})
-        return result
-    except Exception as e:
-        log_error(f"Cypher error occurred: {str(e)}")
-        print(e)
-        return "Unable to fetch warehouse inventory at the moment. Please try again later or contact support."
-
-def purchase_order_info(query):
-    try:
-        result = cypher_chain.invoke({"query": query})
-        return result
-    except Exception as e:
-        log_error(f"Cypher error occurred: {str(e)}")
-        print(e)
-        return "Unable to retrieve purchase order information. Please try again later or contact support."
-
-def customer_info(query):
-    try:
-        result = cypher_chain.invoke({"query": query})
-        return result
-    except Exception as e:
-        log_error(f"Cypher error occurred: {str(e)}")
-        print(e)
-        return "Unable to retrieve customer information. Please try again later or contact support."
-
-tools = [
-    Tool.from_function(
-        name="Product Information",
-        description="Answer product-related and warehouse-related questions using Cypher in the Neo4j database.",
-        func=cypher_qa,
-    ),
-    Tool.from_function(
-        name="Order Tracking",
-        description="Help track orders based on customer input using Cypher queries in the Neo4j database.",
-        func=order_tracking,
-    ),
-    Tool.from_function(
-        name="Supplier Information",
-        description="Fetch supplier-related information using Cypher queries in the Neo4j database.",
-        func=supplier_info,
-    ),
-    Tool.from_function(
-        name="Warehouse Inventory",
-        description="Fetch the status of warehouse inventory using Cypher queries in the Neo4j database.",
-        func=warehouse_inventory,
-    ),
-    Tool.from_function(
-        name="Purchase Order Information",
-        description="Retrieve information related to purchase orders using Cypher queries in the Neo4j database.",
-        func=purchase_order_info,
-    ),
-    Tool.from_function(
-        name="Customer Information",
-        description="Retrieve customer-related information using Cypher queries in the Neo4j database.",
-        func=customer_info,
-    ),
-    Tool.from_function(
-        name="General Chat",
-        description="For general questions or unstructured queries.",
-        func=llm.invoke,
-    )
-]
-
-# Get current date components
-current_year = datetime.now().year
-current_month_name = datetime.now().strftime("%B")
-
-# Create agent prompt
-agent_prompt = PromptTemplate.from_template(f"""
-You are an expert in answering product-related questions by accessing a Neo4j database and generating Cypher queries.
-When the user asks about products, sales, orders, warehouses, suppliers, or customers, use the corresponding tool.
-If the question is general or does not require database access, use 'General Chat'.
-limit output to maximum 5 responses.
-Limit responses to the **final answer only**. Do not include additional action metadata in the response.                                            
-
-Date Interpretation Guidelines:
-1. When the input contains "this month," interpret it as "{current_month_name} {current_year}".
-2. For "this week" or "today," use the specific date range based on the current date.
-3. If a specific month is mentioned without a year, interpret it as "{current_year}" unless the year is specified otherwise.
-4. If the input is unclear about the date, ask the user to clarify, specifying both month and year.
-
-TOOLS:
-------
-You have access to the following tools:
-{{tools}}
-
-To use a tool, follow this format:
-Thought: Do I need to use a tool? Yes
-Action: the action to take, should be one of [{{tool_names}}]
-Action Input: the input to the action
-Observation: the result of the action
-
-When you have a response to say to the Human, or if you do not need to use a tool, respond in this format:
-Thought: Do I need to use a tool? No
-
-Logic for Final Answer:
-- If the user input matches with specific schema terms, identify relevant nodes, properties, and relationships and construct the Cypher query accordingly.
-- If input is a simple greeting like "Hello" or "Hi", respond with the generated Final Answer: your response here.
-- For simple numbers, prompt for specifics related to products, sales, warehouses, orders, or suppliers.
-- For sensitive inquiries, respond with:
-  Final Answer: Please contact ABC Customer Service for assistance with products, sales, warehouses, orders, or suppliers.
-- For date-related questions with terms like "this month" or "{current_month_name}", automatically substitute with the appropriate month and year.
-- If none of the above conditions are met, respond with:
-  Final Answer: Could you please provide more details related to products, sales, warehouses, orders, or suppliers at ABC?
-
-Previous conversation history:
-{{chat_history}}
-
-New input: {{input}}
-{{agent_scratchpad}}
-""")
-
-# Initialize the Graph Cypher QA Chain
-cypher_chain = GraphCypherQAChain.from_llm(
-    llm,
-    graph=graph,
-    cypher_prompt=PromptTemplate(template=CYPHER_GENERATION_TEMPLATE, input_variables=["question"]),
-    verbose=True,
-    allow_dangerous_requests=True, # Allow dangerous requests
-    temperature=0.01, # Set the temperature
-)
-
-# Create the agent
-agent = create_react_agent(llm, tools, agent_prompt)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, allow_dangerous_requests=True)
-
-# Create RunnableWithMessageHistory for message history tracking
-chat_agent = RunnableWithMessageHistory(
-    agent_executor,
-    get_memory,
-    input_messages_key="input",
-    history_messages_key="chat_history",
-)
-
-# Function to generate response based on input
-def generate_response(user_input):
-    """
-    Create a handler that calls the conversational agent
-    and returns a response
-    """
-    try:
-        response = chat_agent.invoke(
-            {"input": user_input},
-            {"configurable": {"session_id": get_session_id()}}
-        )
-        print(response)
-        
-        # Extract the Final Answer from the chain execution
-        if response['output']:
-            final_answer = response['output']
-        else:
-            final_answer = "I couldn't find the exact information in the database. Please try again or contact support."
-        
-        return final_answer
-    except Exception as e:
-        # Log the error (optional)
-        log_error(f"Error generating response: {str(e)}")
-        # Return a generic error message
-        return "There was an issue processing your request. Please try again later or contact support."
-
-# Console-based chat loop
-def chat_loop():
-    print("Hello! I am your product chatbot. How can I assist you today?")
-    while True:
-        user_input = input("You: ")
-        if user_input.lower() in ['exit', 'quit']:
-            print("Chatbot: Goodbye!")
-            break
-        response = generate_response(user_input)
-        print(f"Chatbot: {response}")
-
-# Start the chat loop
-if __name__ == "__main__":
-    chat_loop()
+import os
+import re
+import sys
+import json
+import uuid
+import queue
+import atexit
+import string
+import asyncio
+import hashlib
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from functools import lru_cache
+from datetime import date
+
+# Set up logging (optional). Records pass through an in-memory queue to a
+# background listener thread, so the file write never stalls a response.
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, logging.FileHandler('chatbot_errors.log'))
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.getLogger().setLevel(logging.ERROR)
+logging.getLogger().addHandler(QueueHandler(log_queue))
+
+# Utility function to generate unique session IDs
+def get_session_id():
+    """
+    Generate a unique session ID for tracking chat sessions.
+    This can be used to uniquely identify each session.
+    """
+    return uuid.uuid4().hex  # Generate a unique session ID (hex skips the hyphen formatter)
+
+# Only the most recent messages of a session are replayed into the prompt;
+# older turns stay persisted in Neo4j but are not fetched or re-tokenized.
+# Neo4jChatMessageHistory's window counts exchanges, so 10 messages = 5.
+HISTORY_WINDOW = 10
+
+@lru_cache(maxsize=1024)
+def get_memory(session_id):
+    return Neo4jChatMessageHistory(session_id=session_id, graph=graph, window=HISTORY_WINDOW // 2)
+
+# Function to log errors
+def log_error(error_message):
+    logging.error(error_message)
+
+# Verbose chain/agent tracing costs stdout writes on every step, so it is
+# opt-in via the CHAT_DEBUG environment variable
+DEBUG = bool(os.getenv("CHAT_DEBUG"))
+
+# Fetch API credentials
+openai_api_key = os.getenv("open_api_key")
+openai_api_version = os.getenv("openai_api_version")
+openai_api_base = os.getenv("openai_api_base")
+
+# Matches the trailing "// params: {...}" comment emitted by the Cypher prompt
+PARAMS_COMMENT = re.compile(r'//\s*params:\s*(\{.*\})\s*$', re.IGNORECASE | re.MULTILINE)
+
+# Prompt template for Cypher query generation
+CYPHER_GENERATION_TEMPLATE = """
+You are an expert Neo4j Developer translating user questions into Cypher to answer questions about products and provide recommendations.
+Convert the user's question based on the schema provided.
+
+Instructions:
+- Use only the provided Nodes and Relationships in the schema.
+- Use only the provided relationship types and properties in the schema.
+- Cypher Query should start with "USE neo4j" every time.
+- toLower function should be used for all attributes in the schema.
+- and convert every attribute to string before using it in the query.
+- always use `WHERE` clauses with `CONTAINS` for partial string matching (Don't use attributes names after `CONTAINS`)
+- check the user input has a word in the schema such as Nodes,Relationships and Properties.
+- Never embed user-supplied values as literals in the query. Use Cypher parameters instead (e.g. `CONTAINS $term`).
+- After the query, append one final line with the parameter values as JSON, for example: // params: {{"term": "widget"}}
+
+Schema:
+Nodes:
+- CompanyNode Labels and Properties:
+  ['Customer']: ['CustomerCode', 'CustomerName']
+  ['Supplier']: ['BuyerCode', 'Supplier','SupplierName']
+  ['Product']: ['ItemCost', 'ItemType', 'PartDescription', 'PartNo', 'PriceWithoutTax']
+
+Relationship Types and Properties:
+- (Customer)-[:PLACES]->(SalesOrder)
+- (SalesOrder)-[:INCLUDES_PRODUCT{{ OrderQty, ShippedQty, BOQty}}]->(Product)
+- (SalesOrder)-[:DISPATCHED_BY]->(Warehouse)
+- (Warehouse)-[:DELIVERS_TO]->(Customer)
+- (Company)-[:OWNS]->(Warehouse)
+- (Company)-[:ISSUES]->(PurchaseOrder)
+
+Question: {question}
+
+"""
+
+# Vocabulary the schema can actually answer about, used to pre-route input
+# in Python before paying for an Azure OpenAI round-trip
+SCHEMA_TERMS = (
+    "customer", "supplier", "product", "warehouse", "order",
+    "sales", "purchase", "company", "item", "part", "price", "cost",
+    "buyer", "stock", "inventory", "delivery", "dispatch", "ship",
+)
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+if ahocorasick is not None:
+    # O(len(input)) scan over all schema terms at once
+    schema_automaton = ahocorasick.Automaton()
+    for term in SCHEMA_TERMS:
+        schema_automaton.add_word(term, term)
+    schema_automaton.make_automaton()
+
+    def mentions_schema(text):
+        return any(True for _ in schema_automaton.iter(text.lower()))
+else:
+    def mentions_schema(text):
+        text = text.lower()
+        return any(term in text for term in SCHEMA_TERMS)
+
+# Exact greetings that can be answered without the agent. Anything else,
+# however short - clarification replies like "June 2024" or a bare customer
+# name - still goes through the agent so it lands in session history.
+GREETING_WORDS = frozenset({
+    "hello", "hi", "hey", "hiya", "good morning", "good afternoon", "good evening",
+})
+
+GREETING_REPLY = (
+    "Hello! I can help with products, sales, warehouses, orders, suppliers, "
+    "or customers at ABC. What would you like to know?"
+)
+
+# Short-lived cache of Cypher chain results so repeated questions skip
+# both the Azure OpenAI call and the Neo4j round-trip; the TTLCache is
+# built in init() alongside the rest of the third-party stack
+query_cache = None
+query_cache_lock = threading.Lock()
+
+def cache_key(query):
+    return hashlib.blake2b(query.strip().lower().encode()).hexdigest()
+
+# Create tools for the agent with error handling
+def make_tool(error_message):
+    """
+    Build sync and async tool functions that run the query through the
+    Cypher chain and fall back to the given error message on failure.
+    The async variant lets the agent dispatch independent tool calls
+    concurrently with asyncio.gather instead of serializing them.
+    """
+    def _run(query):
+        key = cache_key(query)
+        with query_cache_lock:
+            if key in query_cache:
+                return query_cache[key]
+        try:
+            result = cypher_chain.invoke({"query": query})
+            with query_cache_lock:
+                query_cache[key] = result
+            return result
+        except Exception as e:
+            log_error(f"Cypher error occurred: {str(e)}")
+            return error_message
+
+    async def _arun(query):
+        key = cache_key(query)
+        with query_cache_lock:
+            if key in query_cache:
+                return query_cache[key]
+        try:
+            result = await cypher_chain.ainvoke({"query": query})
+            with query_cache_lock:
+                query_cache[key] = result
+            return result
+        except Exception as e:
+            log_error(f"Cypher error occurred: {str(e)}")
+            return error_message
+
+    return _run, _arun
+
+# (name, description, error message) for each Cypher-backed tool
+CYPHER_TOOLS = [
+    (
+        "product_information",
+        "Answer product-related and warehouse-related questions using Cypher in the Neo4j database.",
+        "There was an issue processing your request. Please try again or contact support.",
+    ),
+    (
+        "order_tracking",
+        "Help track orders based on customer input using Cypher queries in the Neo4j database.",
+        "Unable to track the order at the moment. Please try again later or contact support.",
+    ),
+    (
+        "supplier_information",
+        "Fetch supplier-related information using Cypher queries in the Neo4j database.",
+        "Unable to fetch supplier information. Please try again later or contact support.",
+    ),
+    (
+        "warehouse_inventory",
+        "Fetch the status of warehouse inventory using Cypher queries in the Neo4j database.",
+        "Unable to fetch warehouse inventory at the moment. Please try again later or contact support.",
+    ),
+    (
+        "purchase_order_information",
+        "Retrieve information related to purchase orders using Cypher queries in the Neo4j database.",
+        "Unable to retrieve purchase order information. Please try again later or contact support.",
+    ),
+    (
+        "customer_information",
+        "Retrieve customer-related information using Cypher queries in the Neo4j database.",
+        "Unable to retrieve customer information. Please try again later or contact support.",
+    ),
+]
+
+# Get current date components, cached per day so a long-running process
+# never serves a stale month or year
+@lru_cache(maxsize=8)
+def date_parts(today):
+    return {"current_month_name": today.strftime("%B"), "current_year": today.year}
+
+# Agent system prompt body. The model picks tools through Azure's native
+# function calling, so no ReAct Thought/Action scaffolding is needed. The
+# $-placeholders are filled with the current month and year by
+# string.Template before the prompt is built, so LangChain's per-step
+# formatting never touches the date values.
+AGENT_PROMPT_TEMPLATE = """
+You are an expert in answering product-related questions by accessing a Neo4j database and generating Cypher queries.
+When the user asks about products, sales, orders, warehouses, suppliers, or customers, call the corresponding tool.
+If the question is general or does not require database access, use 'general_chat'.
+limit output to maximum 5 responses.
+Limit responses to the **final answer only**. Do not include additional action metadata in the response.
+
+Date Interpretation Guidelines:
+1. When the input contains "this month," interpret it as "$current_month_name $current_year".
+2. For "this week" or "today," use the specific date range based on the current date.
+3. If a specific month is mentioned without a year, interpret it as "$current_year" unless the year is specified otherwise.
+4. If the input is unclear about the date, ask the user to clarify, specifying both month and year.
+
+Response Guidelines:
+- If the user input matches with specific schema terms, identify relevant nodes, properties, and relationships and construct the Cypher query accordingly.
+- If input is a simple greeting like "Hello" or "Hi", respond directly without calling a tool.
+- For simple numbers, prompt for specifics related to products, sales, warehouses, orders, or suppliers.
+- For sensitive inquiries, respond with:
+  Please contact ABC Customer Service for assistance with products, sales, warehouses, orders, or suppliers.
+- For date-related questions with terms like "this month" or "$current_month_name", automatically substitute with the appropriate month and year.
+- If none of the above conditions are met, respond with:
+  Could you please provide more details related to products, sales, warehouses, orders, or suppliers at ABC?
+"""
+
+# Heavy objects built lazily by init() so importing this module costs only
+# the stdlib; the LangChain stack alone takes on the order of seconds.
+Neo4jChatMessageHistory = None
+graph = None
+shared_http_client = None
+llm = None
+cypher_llm = None
+cypher_chain = None
+tools = None
+chat_agent_for = None
+
+def _install_orjson():
+    """Point LangChain's dump/load serialization at orjson when available."""
+    try:
+        import orjson
+    except ImportError:
+        return
+    from langchain_core.load import dump as _lc_dump, load as _lc_load
+
+    class _OrjsonShim:
+        """json-module lookalike that LangChain's dump/load can call into."""
+        @staticmethod
+        def dumps(obj, *, default=None, indent=None, **kwargs):
+            option = orjson.OPT_INDENT_2 if indent else 0
+            return orjson.dumps(obj, default=default, option=option).decode()
+
+        @staticmethod
+        def loads(s, **kwargs):
+            # langchain_core.load.loads relies on object_hook to revive
+            # serialized objects; orjson has no equivalent, so any kwargs
+            # mean the stdlib must handle the call
+            if kwargs:
+                return json.loads(s, **kwargs)
+            return orjson.loads(s)
+
+    _lc_dump.json = _OrjsonShim
+    _lc_load.json = _OrjsonShim
+
+@lru_cache(maxsize=1)
+def init():
+    """
+    Import the LangChain/Neo4j/httpx stack and build the shared graph,
+    models, chain and agent. Deferred to first use so module import
+    stays cheap; lru_cache makes repeat calls free.
+    """
+    global Neo4jChatMessageHistory, graph, shared_http_client, llm, cypher_llm
+    global cypher_chain, tools, chat_agent_for, query_cache
+
+    import httpx
+    from cachetools import TTLCache
+    from langchain_community.graphs import Neo4jGraph
+    from langchain.chains import GraphCypherQAChain
+    from langchain.prompts import PromptTemplate
+    from langchain_openai import AzureChatOpenAI
+    from langchain.tools import Tool
+    from langchain.agents import AgentExecutor, create_tool_calling_agent
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+    from langchain_core.caches import BaseCache
+    from langchain_core.runnables.history import RunnableWithMessageHistory
+    from langchain_community.chat_message_histories import (
+        Neo4jChatMessageHistory as _Neo4jChatMessageHistory,
+    )
+
+    Neo4jChatMessageHistory = _Neo4jChatMessageHistory
+
+    # Use the C-accelerated orjson for LangChain's serialization when
+    # available; the cost of dumping agent state grows with chat_history.
+    _install_orjson()
+
+    query_cache = TTLCache(maxsize=512, ttl=300)
+
+    class ParameterizedNeo4jGraph(Neo4jGraph):
+        """
+        Neo4jGraph that lifts a trailing "// params: {...}" comment out of
+        generated Cypher and passes the values as real query parameters, so
+        structurally identical questions hit Neo4j's query-plan cache instead
+        of being re-planned for every new literal.
+        """
+        def query(self, query, params={}):
+            match = PARAMS_COMMENT.search(query)
+            if match:
+                try:
+                    extracted = json.loads(match.group(1))
+                except ValueError as e:
+                    log_error(f"Could not parse Cypher params comment: {str(e)}")
+                else:
+                    params = {**params, **extracted}
+                    query = query[:match.start()] + query[match.end():]
+            return super().query(query, params=params)
+
+    class CypherGenerationCache(BaseCache):
+        """
+        TTL-bounded LLM cache for the question-to-Cypher generation step.
+        Generated Cypher is deterministic for identical questions, so it can
+        be cached far longer than query results: the cached query is still
+        executed fresh every time, keeping the returned data live.
+        """
+        def __init__(self, maxsize=2048, ttl=3600):
+            self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+            self._lock = threading.Lock()
+
+        def _key(self, prompt, llm_string):
+            return hashlib.blake2b(f"{prompt.strip().lower()}:{llm_string}".encode()).hexdigest()
+
+        def lookup(self, prompt, llm_string):
+            with self._lock:
+                return self._cache.get(self._key(prompt, llm_string))
+
+        def update(self, prompt, llm_string, return_val):
+            with self._lock:
+                self._cache[self._key(prompt, llm_string)] = return_val
+
+        def clear(self, **kwargs):
+            with self._lock:
+                self._cache.clear()
+
+    # Initialize the Neo4j graph connection
+    # Single graph shared by the memory store and the Cypher chain. The pool
+    # is widened beyond the driver default so concurrent tool calls don't
+    # queue behind a handful of Bolt connections.
+    graph = ParameterizedNeo4jGraph(
+        url="bolt://localhost:7687",
+        username="neo4j",
+        password="########",  # Ensure this is correct for your setup
+        database="neo4j",
+        driver_config={
+            "max_connection_pool_size": 64,
+            "connection_acquisition_timeout": 30,
+            "max_connection_lifetime": 3600,
+            "keep_alive": True,
+        },
+    )
+
+    # One process-wide HTTP client for all Azure OpenAI calls: HTTP/2
+    # multiplexing plus keepalive avoids a TLS handshake per request.
+    # httpx only speaks HTTP/2 with the optional h2 package installed.
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    shared_http_client = httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        timeout=60,
+    )
+
+    # Initialize the AzureChatOpenAI model
+    llm = AzureChatOpenAI(
+        temperature=0.01,
+        streaming=True,
+        azure_deployment="gpt-4o",
+        api_version=openai_api_version,
+        api_key=openai_api_key,
+        azure_endpoint=openai_api_base,
+        http_async_client=shared_http_client,
+    )
+
+    # Copy of the chat model reserved for the agent's own turns; the tag
+    # lets generate_response pick the final answer's token deltas out of
+    # the event stream without also printing tool-internal LLM output
+    agent_llm = AzureChatOpenAI(
+        temperature=0.01,
+        streaming=True,
+        azure_deployment="gpt-4o",
+        api_version=openai_api_version,
+        api_key=openai_api_key,
+        azure_endpoint=openai_api_base,
+        http_async_client=shared_http_client,
+        tags=["agent_llm"],
+    )
+
+    # Dedicated non-streaming model for Cypher generation, fronted by the
+    # one-hour generation cache above
+    cypher_llm = AzureChatOpenAI(
+        temperature=0.01,
+        azure_deployment="gpt-4o",
+        api_version=openai_api_version,
+        api_key=openai_api_key,
+        azure_endpoint=openai_api_base,
+        http_async_client=shared_http_client,
+        cache=CypherGenerationCache(),
+    )
+
+    # Initialize the Graph Cypher QA Chain
+    cypher_chain = GraphCypherQAChain.from_llm(
+        cypher_llm=cypher_llm,
+        qa_llm=llm,
+        graph=graph,
+        cypher_prompt=PromptTemplate(template=CYPHER_GENERATION_TEMPLATE, input_variables=["question"]),
+        verbose=DEBUG,
+        allow_dangerous_requests=True, # Allow dangerous requests
+        temperature=0.01, # Set the temperature
+    )
+
+    tools = []
+    for name, description, error_message in CYPHER_TOOLS:
+        func, coroutine = make_tool(error_message)
+        tools.append(Tool.from_function(name=name, description=description, func=func, coroutine=coroutine))
+    tools.append(
+        Tool.from_function(
+            name="general_chat",
+            description="For general questions or unstructured queries.",
+            func=llm.invoke,
+            coroutine=llm.ainvoke,
+        )
+    )
+
+    @lru_cache(maxsize=2)
+    def build_chat_agent(today):
+        """
+        Agent wired to a prompt with that day's month and year already
+        substituted; rebuilt only when the date rolls over, so per-step
+        formatting carries no date variables.
+        """
+        system_text = string.Template(AGENT_PROMPT_TEMPLATE).safe_substitute(date_parts(today))
+        agent_prompt = ChatPromptTemplate.from_messages([
+            ("system", system_text),
+            MessagesPlaceholder("chat_history"),
+            ("human", "{input}"),
+            MessagesPlaceholder("agent_scratchpad"),
+        ])
+        agent = create_tool_calling_agent(agent_llm, tools, agent_prompt)
+        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=DEBUG, allow_dangerous_requests=True)
+        # RunnableWithMessageHistory for message history tracking
+        return RunnableWithMessageHistory(
+            agent_executor,
+            get_memory,
+            input_messages_key="input",
+            history_messages_key="chat_history",
+        )
+
+    chat_agent_for = build_chat_agent
+
+# Function to generate response based on input
+def emit(text):
+    """Write a piece of the response to stdout immediately."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+async def generate_response(user_input, session_id):
+    """
+    Create a handler that streams the conversational agent's answer to
+    stdout as it is produced and returns the full response
+    """
+    # Plain greetings get a canned reply without spending an LLM round-trip;
+    # the schema scan keeps e.g. "hi, order status?" on the agent path
+    if user_input.strip().lower().strip("!.?,") in GREETING_WORDS and not mentions_schema(user_input):
+        emit(GREETING_REPLY)
+        return GREETING_REPLY
+    init()
+    try:
+        final_answer = ""
+        async for event in chat_agent_for(date.today()).astream_events(
+            {"input": user_input},
+            {"configurable": {"session_id": session_id}},
+            version="v2",
+        ):
+            # Token deltas from the agent's own model (tool-call steps
+            # carry no content, so only the final answer streams here);
+            # print each piece as soon as it arrives
+            if event["event"] == "on_chat_model_stream" and "agent_llm" in event.get("tags", []):
+                piece = event["data"]["chunk"].content or ""
+                if piece:
+                    emit(piece)
+                    final_answer += piece
+
+        if not final_answer:
+            final_answer = "I couldn't find the exact information in the database. Please try again or contact support."
+            emit(final_answer)
+
+        return final_answer
+    except Exception as e:
+        # Log the error (optional)
+        log_error(f"Error generating response: {str(e)}")
+        # Return a generic error message
+        message = "There was an issue processing your request. Please try again later or contact support."
+        emit(message)
+        return message
+
+# Warm-up so the first user turn doesn't pay the cold-start costs
+async def warm_up():
+    """
+    Open the Bolt connection pool and the Azure OpenAI TLS connection
+    before the first user turn. Failures are logged, not fatal: the
+    first real request will surface any genuine connectivity problem.
+    """
+    init()
+    try:
+        graph.query("RETURN 1")
+    except Exception as e:
+        log_error(f"Neo4j warm-up failed: {str(e)}")
+    try:
+        await llm.ainvoke("ping")
+    except Exception as e:
+        log_error(f"LLM warm-up failed: {str(e)}")
+
+# Words that end the chat loop
+EXIT_WORDS = frozenset({'exit', 'quit'})
+
+# Console-based chat loop
+async def chat_loop():
+    print("Hello! I am your product chatbot. How can I assist you today?")
+    session_id = get_session_id()  # One session per chat run so history carries across turns
+    try:
+        while True:
+            # Read input off the event loop so other sessions are not blocked
+            user_input = await asyncio.to_thread(input, "You: ")
+            if user_input.lower() in EXIT_WORDS:
+                print("Chatbot: Goodbye!")
+                break
+            if user_input.lower() == '!clearcache':
+                if query_cache is not None:
+                    with query_cache_lock:
+                        query_cache.clear()
+                print("Chatbot: Query cache cleared.")
+                continue
+            emit("Chatbot: ")
+            await generate_response(user_input, session_id)
+            print()
+    finally:
+        if shared_http_client is not None:
+            await shared_http_client.aclose()
+
+async def main():
+    await warm_up()
+    await chat_loop()
+
+# Start the chat loop
+if __name__ == "__main__":
+    asyncio.run(main())